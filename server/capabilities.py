@@ -0,0 +1,71 @@
+import ctypes
+import functools
+import logging
+import os
+import platform
+from types import ModuleType
+from typing import Any, Callable, NamedTuple, Optional
+
+# Optional video outputs are probed at most once per process. NDI and Syphon
+# are probed separately so enabling one never loads the other's native libs.
+
+NDI_DYLIB_PATH = "/usr/local/lib/libndi.dylib"
+
+
+class NDICapabilities(NamedTuple):
+    available: bool
+    module: Optional[ModuleType] = None
+    error: Optional[Exception] = None
+
+
+class SyphonCapabilities(NamedTuple):
+    available: bool
+    metal: Optional[ModuleType] = None
+    server_class: Optional[type] = None
+    create_mtl_texture: Optional[Callable[..., Any]] = None
+    error: Optional[Exception] = None
+
+
+def _preload_ndi_dylib() -> None:
+    """Expose the NDI runtime to the Python wrapper on macOS."""
+    if not os.path.exists(NDI_DYLIB_PATH):
+        return
+    ndi_dir = os.path.dirname(NDI_DYLIB_PATH)
+    os.environ.setdefault("NDI_RUNTIME_DIR_V5", ndi_dir)
+    dyld = os.environ.get("DYLD_LIBRARY_PATH", "")
+    if ndi_dir not in dyld.split(":"):
+        os.environ["DYLD_LIBRARY_PATH"] = f"{ndi_dir}:{dyld}" if dyld else ndi_dir
+    # Preload the dylib globally so the Python wrapper can resolve symbols
+    try:
+        ctypes.CDLL(NDI_DYLIB_PATH, mode=ctypes.RTLD_GLOBAL)
+    except Exception as e:
+        logging.warning(f"Failed to preload NDI dylib: {e}")
+
+
+@functools.cache
+def ndi_capabilities() -> NDICapabilities:
+    try:
+        if platform.system() == "Darwin":
+            _preload_ndi_dylib()
+        import NDIlib  # type: ignore
+    except Exception as e:
+        logging.warning(f"NDIlib import failed: {e}")
+        return NDICapabilities(available=False, error=e)
+    return NDICapabilities(available=True, module=NDIlib)
+
+
+@functools.cache
+def syphon_capabilities() -> SyphonCapabilities:
+    try:
+        import Metal  # type: ignore
+        from syphon import SyphonMetalServer  # type: ignore
+        from syphon.utils.raw import create_mtl_texture  # type: ignore
+    except Exception as e:  # pragma: no cover
+        logging.warning(f"syphon-python import failed: {e}")
+        return SyphonCapabilities(available=False, error=e)
+    return SyphonCapabilities(
+        available=True,
+        metal=Metal,
+        server_class=SyphonMetalServer,
+        create_mtl_texture=create_mtl_texture,
+    )
@@ -0,0 +1,67 @@
+import logging
+
+import numpy as np
+
+# Numba is optional: when present, the per-frame R/B channel swap (with an
+# optional vertical flip) runs as a compiled kernel, otherwise the numpy path
+# below is used. A plain flip is always done with np.copyto, which beats a
+# serial per-byte loop.
+#
+# The kernel is called concurrently from the per-stream sender threads, so it
+# is deliberately not parallel=True: numba's threading layers are either not
+# thread-safe (workqueue) or can hang interpreter exit when entered from
+# non-main threads (tbb). Instead it is compiled nogil, so sender threads
+# run it side by side.
+_NUMBA_AVAILABLE = False
+
+try:
+    from numba import njit  # type: ignore
+
+    _NUMBA_AVAILABLE = True
+except Exception as e:  # pragma: no cover
+    logging.info(f"numba not available, using numpy frame kernels: {e}")
+
+
+if _NUMBA_AVAILABLE:
+
+    @njit(cache=True, nogil=True)
+    def _rgba_to_bgra_numba(src, dst, flip):
+        h = src.shape[0]
+        w = src.shape[1]
+        for row in range(h):
+            sy = h - 1 - row if flip else row
+            for x in range(w):
+                dst[row, x, 0] = src[sy, x, 2]
+                dst[row, x, 2] = src[sy, x, 0]
+                dst[row, x, 1] = src[sy, x, 1]
+                dst[row, x, 3] = src[sy, x, 3]
+
+
+def _rgba_to_bgra_numpy(src: np.ndarray, dst: np.ndarray, flip: bool) -> None:
+    # Each pixel is reinterpreted as a little-endian uint32 (0xAABBGGRR) so the
+    # swap is a couple of contiguous bitwise passes instead of a fancy-index gather.
+    px = src.view("<u4")[..., 0]
+    if flip:
+        px = px[::-1]
+    out = dst.view("<u4")[..., 0]
+    np.bitwise_and(px, 0xFF00FF00, out=out)
+    out |= (px >> 16) & 0x000000FF
+    out |= (px & 0x000000FF) << 16
+
+
+def rgba_to_bgra(src: np.ndarray, dst: np.ndarray, flip: bool = False) -> np.ndarray:
+    """Write ``src`` (HxWx4 uint8 RGBA) into ``dst`` as BGRA, optionally flipped vertically.
+
+    Both arrays must be C-contiguous with the same shape; ``dst`` is returned.
+    """
+    if _NUMBA_AVAILABLE:
+        _rgba_to_bgra_numba(src, dst, flip)
+    else:
+        _rgba_to_bgra_numpy(src, dst, flip)
+    return dst
+
+
+def flip_rows(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Write ``src`` (HxWx4 uint8) into ``dst`` with the row order reversed."""
+    np.copyto(dst, src[::-1])
+    return dst
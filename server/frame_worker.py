@@ -0,0 +1,95 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import platform
+import threading
+from typing import Any, Callable, Optional
+
+# QOS_CLASS_USER_INTERACTIVE from <sys/qos.h>
+_QOS_CLASS_USER_INTERACTIVE = 0x21
+
+_libsystem = None
+if platform.system() == "Darwin":
+    try:
+        _libsystem = ctypes.CDLL(
+            ctypes.util.find_library("System") or "/usr/lib/libSystem.B.dylib"
+        )
+        _libsystem.pthread_set_qos_class_self_np.argtypes = [ctypes.c_uint, ctypes.c_int]
+        _libsystem.pthread_set_qos_class_self_np.restype = ctypes.c_int
+    except Exception as e:
+        logging.debug(f"Could not load libSystem for thread QoS: {e}")
+        _libsystem = None
+
+
+def _raise_thread_priority() -> None:
+    """Best-effort bump of the calling thread's scheduling priority."""
+    try:
+        if _libsystem is not None:
+            rc = _libsystem.pthread_set_qos_class_self_np(_QOS_CLASS_USER_INTERACTIVE, 0)
+            if rc != 0:
+                logging.debug(
+                    f"Could not raise sender thread priority: "
+                    f"pthread_set_qos_class_self_np returned {rc} ({os.strerror(rc)})"
+                )
+        elif platform.system() == "Linux":
+            # niceness is per-thread on Linux; lowering it needs CAP_SYS_NICE
+            os.nice(-5)
+    except Exception as e:
+        logging.debug(f"Could not raise sender thread priority: {e}")
+
+
+class LatestFrameWorker:
+    """Runs ``handler`` on a background thread for the most recently submitted frame.
+
+    The pending slot holds a single frame: submitting while the handler is busy
+    replaces the pending frame instead of queueing it, so a slow consumer drops
+    frames rather than blocking the producer.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], None],
+        name: str = "frame-worker",
+        high_priority: bool = False,
+    ) -> None:
+        self._handler = handler
+        self._high_priority = high_priority
+        self._slot: Optional[Any] = None
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, frame: Any) -> None:
+        with self._cond:
+            self._slot = frame
+            self._cond.notify()
+
+    def _run(self) -> None:
+        if self._high_priority:
+            _raise_thread_priority()
+        while True:
+            with self._cond:
+                while self._slot is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                frame, self._slot = self._slot, None
+            try:
+                self._handler(frame)
+            except Exception as e:
+                logging.error(f"{self._thread.name} failed: {e}")
+
+    def close(self) -> None:
+        """Stop the worker and wait for it to exit.
+
+        Blocks until any in-flight ``handler`` call has returned, so callers can
+        tear down the resources it uses afterwards. Call it off the event loop.
+        """
+        with self._cond:
+            self._closed = True
+            self._slot = None
+            self._cond.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
@@ -15,15 +15,30 @@ from types import SimpleNamespace
 from util import pil_to_frame, bytes_to_pil, is_firefox, get_pipeline_class
 from device import device, torch_dtype
 import asyncio
+import anyio
 import os
 import time
 import torch
-from ndi_sender import NDISender, NullNDISender
-from syphon_sender import SyphonSender, NullSyphonSender
+from ndi_sender import NDISender, NullNDISender, ndi_available
+from syphon_sender import SyphonSender, NullSyphonSender, syphon_available
 
 
 THROTTLE = 1.0 / 120
 
+# Resolve the sender classes once so disabled outputs cost a no-op call per frame
+NDISenderClass = NullNDISender
+if config.ndi_send:
+    if ndi_available():
+        NDISenderClass = NDISender
+    else:
+        logging.warning("NDIlib not available. NDI send is disabled.")
+SyphonSenderClass = NullSyphonSender
+if config.syphon_send:
+    if syphon_available():
+        SyphonSenderClass = SyphonSender
+    else:
+        logging.warning("Syphon not available. Syphon send is disabled.")
+
 
 class App:
     def __init__(self, config: Args, pipeline):
@@ -107,20 +122,19 @@ class App:
         async def stream(user_id: uuid.UUID, request: Request):
             try:
                 # create an NDI sender per stream if enabled
-                ndi_sender = (
-                    NDISender(f"{self.args.ndi_name} {user_id}")
-                    if getattr(self.args, "ndi_send", False)
-                    else NullNDISender()
-                )
-                syphon_sender = (
-                    SyphonSender(
+                try:
+                    ndi_sender = NDISenderClass(f"{self.args.ndi_name} {user_id}")
+                except RuntimeError as e:
+                    logging.error(f"NDI send is disabled: {e}")
+                    ndi_sender = NullNDISender()
+                try:
+                    syphon_sender = SyphonSenderClass(
                         f"{self.args.syphon_name} {user_id}",
-                        flip_vertical=getattr(
-                            self.args, "syphon_flip_vertical", False),
+                        flip_vertical=self.args.syphon_flip_vertical,
                     )
-                    if getattr(self.args, "syphon_send", False)
-                    else NullSyphonSender()
-                )
+                except RuntimeError as e:
+                    logging.error(f"Syphon send is disabled: {e}")
+                    syphon_sender = NullSyphonSender()
 
                 async def generate():
                     try:
@@ -147,11 +161,11 @@ class App:
                                 continue
                             # Send to NDI if enabled
                             try:
-                                ndi_sender.send_image(image)
+                                ndi_sender.send_frame(image)
                             except Exception as e:
                                 logging.error(f"NDI send error: {e}")
                             try:
-                                syphon_sender.send_image(image)
+                                syphon_sender.send_frame(image)
                             except Exception as e:
                                 logging.error(f"Syphon send error: {e}")
                             frame = pil_to_frame(image)
@@ -162,14 +176,21 @@ class App:
                             if self.args.debug:
                                 print(f"Time taken: {time.time() - last_time}")
                     finally:
-                        try:
-                            ndi_sender.close()
-                        except Exception:
-                            pass
-                        try:
-                            syphon_sender.close()
-                        except Exception:
-                            pass
+                        def close_senders():
+                            try:
+                                ndi_sender.close()
+                            except Exception:
+                                pass
+                            try:
+                                syphon_sender.close()
+                            except Exception:
+                                pass
+
+                        # close() waits for the sender threads, so run it off the
+                        # event loop; shield it from the disconnect cancellation so
+                        # both senders are always torn down.
+                        with anyio.CancelScope(shield=True):
+                            await anyio.to_thread.run_sync(close_senders)
 
                 return StreamingResponse(
                     generate(),
@@ -215,6 +236,9 @@ app = App(config, pipeline).app
 if __name__ == "__main__":
     import uvicorn
 
+    if config.reload:
+        # reload workers re-import config; tell them not to print it again
+        os.environ["UVICORN_RELOAD_CHILD"] = "1"
     uvicorn.run(
         "main:app",
         host=config.host,
@@ -2,54 +2,62 @@ import ctypes
 import numpy as np
 from PIL import Image
 import logging
-from typing import Optional
-import os
-import platform
+from typing import List, Optional, Tuple, Union
+import torch
+
+from capabilities import ndi_capabilities
+from frame_kernels import rgba_to_bgra
+from frame_worker import LatestFrameWorker
+from util import frame_to_rgba, rgb_array, tensor_to_hwc_uint8
 
 ndi = None  # type: ignore
-_NDI_AVAILABLE = False
-
-# Attempt to prepare runtime path (particularly for macOS)
-try:
-    if platform.system() == "Darwin":
-        default_lib_path = "/usr/local/lib/libndi.dylib"
-        if os.path.exists(default_lib_path):
-            ndi_dir = os.path.dirname(default_lib_path)
-            os.environ.setdefault("NDI_RUNTIME_DIR_V5", ndi_dir)
-            dyld = os.environ.get("DYLD_LIBRARY_PATH", "")
-            if ndi_dir not in dyld.split(":"):
-                os.environ["DYLD_LIBRARY_PATH"] = f"{ndi_dir}:{dyld}" if dyld else ndi_dir
-            # Preload the dylib globally so the Python wrapper can resolve symbols
-            try:
-                ctypes.CDLL(default_lib_path, mode=ctypes.RTLD_GLOBAL)
-            except Exception as e:
-                logging.warning(f"Failed to preload NDI dylib: {e}")
-    # Try importing the Python wrapper
-    import NDIlib as ndi  # type: ignore
-    _NDI_AVAILABLE = True
-except Exception as e:
-    logging.warning(f"NDIlib import failed: {e}")
+_UINT8_PTR = ctypes.POINTER(ctypes.c_uint8)
+
+
+def ndi_available() -> bool:
+    """Import NDIlib on first use; returns whether it is available."""
+    global ndi
+    caps = ndi_capabilities()
+    ndi = caps.module
+    return caps.available
 
 
 class NDISender:
     """
     Lightweight wrapper to send PIL images as NDI video frames.
-    Falls back to no-op if NDIlib is not available.
+    Raises RuntimeError if NDI cannot be set up; use NullNDISender when disabled.
     """
 
     def __init__(self, name: str = "LCM NDI"):
         self.name = name
-        self._init_ok = False
         self._sender = None
         self._video_frame = None
-
-        if not _NDI_AVAILABLE:
-            logging.warning("NDIlib not available. NDI send is disabled.")
-            return
+        # Two reused frame buffers (BGRA unless an RGB FourCC is available)
+        # and their cached ctypes pointers; with async sends NDI reads one
+        # while the next frame is written into the other.
+        self._bgra_bufs: Optional[List[np.ndarray]] = None
+        self._bgra_ptrs: List = []
+        self._idx = 0
+        # Whether each buffer's alpha plane still holds 255; RGB frames only
+        # write the colour channels.
+        self._opaque = [True, True]
+        # Array backing the in-flight frame; kept alive until the next send
+        self._frame_ref: Optional[np.ndarray] = None
+        # Pointer cache for source arrays sent as-is (reused when the caller
+        # hands over the same RGBA array again)
+        self._src_arr: Optional[np.ndarray] = None
+        self._src_ptr = None
+        # Pointer currently assigned to the video frame
+        self._data_ptr = None
+        self._last_shape = (0, 0)
+        self._fourcc = 0
+        self._needs_swap = True
+
+        if not ndi_available():
+            raise RuntimeError("NDIlib not available")
 
         if not ndi.initialize():
-            logging.error("Failed to initialize NDI library")
-            return
+            raise RuntimeError("Failed to initialize NDI library")
 
         # Create NDI sender
         send_settings = ndi.SendCreate()
@@ -65,52 +73,141 @@ class NDISender:
 
         self._sender = ndi.send_create(send_settings)
         if self._sender is None:
-            logging.error("Failed to create NDI sender")
-            return
+            ndi.destroy()
+            raise RuntimeError("Failed to create NDI sender")
 
         self._video_frame = ndi.VideoFrameV2()
-        self._init_ok = True
+        # Prefer RGB(X|A) so frames can be sent without an R/B swap; older
+        # bindings only expose the BGR variants.
+        rgb_fourcc = getattr(ndi, "FOURCC_VIDEO_TYPE_RGBX", None) or getattr(
+            ndi, "FOURCC_VIDEO_TYPE_RGBA", None
+        )
+        if rgb_fourcc is not None:
+            self._fourcc = rgb_fourcc
+            self._needs_swap = False
+        else:
+            # Use BGRX (alpha ignored) is common; for BGRA, some bindings use BGRX constant
+            self._fourcc = getattr(ndi, "FOURCC_VIDEO_TYPE_BGRX", None) or getattr(
+                ndi, "FOURCC_VIDEO_TYPE_BGRA", 0
+            )
+        self._video_frame.FourCC = self._fourcc
+        self._video_frame.frame_rate_N = 60
+        self._video_frame.frame_rate_D = 1
+        # Async send returns immediately and keeps the buffer until the next call
+        self._send_video = getattr(ndi, "send_send_video_async_v2", None) or ndi.send_send_video_v2
+        # Conversion and send run off the generation loop; the buffers above
+        # are only touched by the worker thread.
+        self._worker = LatestFrameWorker(
+            self._publish, name=f"NDI send {name}", high_priority=True
+        )
         logging.info(f"NDI sender initialized: {name}")
 
+    def _next_buffer(self, width: int, height: int) -> Tuple[np.ndarray, object]:
+        """Return the buffer not currently owned by NDI and its pointer."""
+        if self._bgra_bufs is None or self._bgra_bufs[0].shape[:2] != (height, width):
+            self._bgra_bufs = [np.empty((height, width, 4), dtype=np.uint8) for _ in range(2)]
+            for buf in self._bgra_bufs:
+                buf[..., 3] = 255
+            self._opaque = [True, True]
+            self._bgra_ptrs = [
+                buf.ctypes.data_as(_UINT8_PTR) for buf in self._bgra_bufs
+            ]
+        self._idx ^= 1
+        return self._bgra_bufs[self._idx], self._bgra_ptrs[self._idx]
+
     def send_image(self, image: Image.Image):
-        if not self._init_ok:
-            return
-        # Convert PIL image (RGB) to BGRA as expected by NDI
+        self.send_frame(image)
+
+    def send_frame(self, frame: Union[Image.Image, np.ndarray, torch.Tensor]):
+        """Queue a PIL image, an RGBA uint8 array or an image tensor for sending.
+
+        Only the latest pending frame is kept; the caller must not modify
+        ``frame`` after handing it over.
+
+        main.py currently passes the pipeline's PIL output; the ndarray and
+        tensor inputs are API only until a pipeline hands over those frames.
+        """
+        self._worker.submit(frame)
+
+    def send_tensor(self, tensor: torch.Tensor):
+        """Queue an image tensor (CHW/HWC, float [0, 1] or uint8), e.g. still on CUDA.
+
+        The channel swap runs on the tensor's device and the result is copied
+        once into the host BGRA buffer, skipping the PIL round-trip. Not used
+        yet: every pipeline returns PIL images (``output_type="pil"``).
+        """
+        self.send_frame(tensor)
+
+    def _publish(self, frame: Union[Image.Image, np.ndarray, torch.Tensor]):
         try:
-            if image.mode != "RGBA":
-                image = image.convert("RGBA")
-            arr = np.array(image, dtype=np.uint8)
-            # RGBA -> BGRA
-            arr = arr[:, :, [2, 1, 0, 3]].copy()
+            if isinstance(frame, torch.Tensor):
+                channels = (2, 1, 0) if self._needs_swap else (0, 1, 2)
+                pixels = tensor_to_hwc_uint8(frame, channels=channels)
+                h, w, _ = pixels.shape
+                buf, ptr = self._next_buffer(w, h)
+                torch.from_numpy(buf).copy_(pixels)
+                self._opaque[self._idx] = True
+            elif (rgb := rgb_array(frame)) is not None:
+                # RGB: one strided copy into the colour channels, alpha is preset
+                h, w, _ = rgb.shape
+                buf, ptr = self._next_buffer(w, h)
+                if not self._opaque[self._idx]:
+                    buf[..., 3] = 255
+                    self._opaque[self._idx] = True
+                buf[..., :3] = rgb[..., ::-1] if self._needs_swap else rgb
+            elif self._needs_swap:
+                # Convert to BGRA as expected by NDI
+                arr = frame_to_rgba(frame)
+                h, w, _ = arr.shape
+                buf, ptr = self._next_buffer(w, h)
+                # RGBA -> BGRA
+                rgba_to_bgra(arr, buf)
+                self._opaque[self._idx] = False
+            else:
+                # RGBA FourCC: send the source pixels untouched
+                arr = frame_to_rgba(frame)
+                h, w, _ = arr.shape
+                if arr is not self._src_arr:
+                    self._src_arr = arr
+                    self._src_ptr = arr.ctypes.data_as(_UINT8_PTR)
+                buf, ptr = arr, self._src_ptr
+            self._send_buffer(w, h, buf, ptr)
+        except Exception as e:
+            logging.error(f"NDI send failed: {e}")
 
-            h, w, _ = arr.shape
+    def _send_buffer(self, w: int, h: int, buf: np.ndarray, ptr):
+        # frame geometry is only rewritten when the size changes
+        if (w, h) != self._last_shape:
             self._video_frame.width = w
             self._video_frame.height = h
-            # Use BGRX (alpha ignored) is common; for BGRA, some bindings use BGRX constant
-            self._video_frame.FourCC = getattr(ndi, "FOURCC_VIDEO_TYPE_BGRX", None) or getattr(
-                ndi, "FOURCC_VIDEO_TYPE_BGRA", 0
-            )
-            self._video_frame.frame_rate_N = 60
-            self._video_frame.frame_rate_D = 1
-            # stride and data pointer
             if hasattr(self._video_frame, "line_stride_in_bytes"):
                 self._video_frame.line_stride_in_bytes = w * 4
-            # set data pointer (ctypes)
-            ptr = arr.ctypes.data_as(ctypes.POINTER(ctypes.c_uint8))
+            self._last_shape = (w, h)
+        # only rewrite the data pointer when it changed
+        if ptr is not self._data_ptr:
+            self._data_ptr = ptr
             if hasattr(self._video_frame, "data"):
                 self._video_frame.data = ptr
             elif hasattr(self._video_frame, "p_data"):
                 self._video_frame.p_data = ptr
 
-            ndi.send_send_video_v2(self._sender, self._video_frame)
-        except Exception as e:
-            logging.error(f"NDI send failed: {e}")
+        self._send_video(self._sender, self._video_frame)
+        # NDI has released the previous frame; hold on to this one instead
+        self._frame_ref = buf
 
     def close(self):
-        if not _NDI_AVAILABLE:
-            return
+        # returns once the worker thread has exited, so nothing is still
+        # using the native resources released below
+        self._worker.close()
         try:
             if self._sender is not None:
+                # flush the pending async frame before its buffer goes away
+                flush = getattr(ndi, "send_send_video_async_v2", None)
+                if callable(flush):
+                    try:
+                        flush(self._sender, None)
+                    except Exception:
+                        pass
                 ndi.send_destroy(self._sender)
                 self._sender = None
             ndi.destroy()
@@ -127,5 +224,11 @@ class NullNDISender:
     def send_image(self, image: Image.Image):
         pass
 
+    def send_frame(self, frame):
+        pass
+
+    def send_tensor(self, tensor: torch.Tensor):
+        pass
+
     def close(self):
         pass
@@ -1,52 +1,70 @@
 import logging
-from typing import Optional
+from typing import Optional, Union
 
 from PIL import Image
 import numpy as np
+import torch
+
+from capabilities import syphon_capabilities
+from frame_kernels import flip_rows
+from frame_worker import LatestFrameWorker
+from util import frame_to_rgba, rgb_array, tensor_to_hwc_uint8
 
 # Syphon-python (https://pypi.org/project/syphon-python/) provides a Metal-based
-# server and utilities to copy numpy RGBA images into a Metal texture.
+# server and texture helpers; frames are uploaded through the pyobjc Metal
+# bindings it depends on.
+
+Metal = None  # type: ignore
+SyphonMetalServer = None  # type: ignore
+create_mtl_texture = None  # type: ignore
 
-_SYPHON_AVAILABLE = False
-_SYPHON_IMPORT_ERROR = None
 
-try:
-    import syphon
-    from syphon import SyphonMetalServer  # type: ignore
-    from syphon.utils.numpy import copy_image_to_mtl_texture  # type: ignore
-    from syphon.utils.raw import create_mtl_texture  # type: ignore
-    _SYPHON_AVAILABLE = True
-except Exception as e:  # pragma: no cover
-    _SYPHON_IMPORT_ERROR = e
-    _SYPHON_AVAILABLE = False
+def syphon_available() -> bool:
+    """Import syphon-python on first use; returns whether it is available."""
+    global Metal, SyphonMetalServer, create_mtl_texture
+    caps = syphon_capabilities()
+    Metal = caps.metal
+    SyphonMetalServer = caps.server_class
+    create_mtl_texture = caps.create_mtl_texture
+    return caps.available
 
 
 class SyphonSender:
     """Syphon sender using syphon-python (Metal backend).
 
-    Creates a SyphonMetalServer and a Metal texture sized to the current image.
-    On each frame, copies the numpy RGBA into the texture and publishes it.
+    Creates a SyphonMetalServer and a Metal texture sized to the current image,
+    plus a shared-storage staging buffer of the same size. On each frame, writes
+    the RGBA pixels into the staging buffer, blits it into the texture and
+    publishes it.
+    Raises RuntimeError if Syphon cannot be set up; use NullSyphonSender when disabled.
     """
 
     def __init__(self, name: str = "LCM Syphon", flip_vertical: bool = False) -> None:
         self.name = name
-        self._server: Optional[SyphonMetalServer] = None  # type: ignore
+        self._server: Optional["SyphonMetalServer"] = None  # type: ignore
         self._texture = None
         self._tex_size = (0, 0)
         self._flip_vertical = flip_vertical
+        # Shared-storage MTLBuffer reused across frames and a numpy view on it
+        self._staging = None
+        self._staging_view: Optional[np.ndarray] = None
+        # Whether the staging alpha plane still holds 255
+        self._staging_opaque = True
+        self._command_queue = None
 
-        if not _SYPHON_AVAILABLE:
-            logging.warning(
-                f"Syphon not available ({_SYPHON_IMPORT_ERROR}). Syphon send is disabled."
-            )
-            return
+        if not syphon_available():
+            raise RuntimeError(f"Syphon not available ({syphon_capabilities().error})")
 
         try:
             self._server = SyphonMetalServer(name)
-            logging.info(f"Syphon sender initialized (Metal): {name}")
+            self._command_queue = self._server.device.newCommandQueue()
         except Exception as e:
-            logging.error(f"Failed to create SyphonMetalServer: {e}")
-            self._server = None
+            raise RuntimeError(f"Failed to create SyphonMetalServer: {e}") from e
+        # Texture upload and publish run off the generation loop
+        self._worker = LatestFrameWorker(
+            self._publish, name=f"Syphon send {name}", high_priority=True
+        )
+        logging.info(f"Syphon sender initialized (Metal): {name}")
 
     def _ensure_texture(self, width: int, height: int) -> None:
         if not self._server:
@@ -55,34 +73,104 @@ class SyphonSender:
             try:
                 self._texture = create_mtl_texture(
                     self._server.device, width, height)
+                nbytes = width * height * 4
+                self._staging = self._server.device.newBufferWithLength_options_(
+                    nbytes, Metal.MTLResourceStorageModeShared
+                )
+                self._staging_view = np.frombuffer(
+                    self._staging.contents().as_buffer(nbytes), dtype=np.uint8
+                ).reshape(height, width, 4)
+                self._staging_view[..., 3] = 255
+                self._staging_opaque = True
                 self._tex_size = (width, height)
                 logging.info(f"Syphon texture (re)created: {width}x{height}")
             except Exception as e:
                 logging.error(f"Failed to create Metal texture: {e}")
                 self._texture = None
+                self._staging = None
+                self._staging_view = None
                 self._tex_size = (0, 0)
 
+    def _blit_staging(self, width: int, height: int) -> None:
+        command_buffer = self._command_queue.commandBuffer()
+        blit = command_buffer.blitCommandEncoder()
+        blit.copyFromBuffer_sourceOffset_sourceBytesPerRow_sourceBytesPerImage_sourceSize_toTexture_destinationSlice_destinationLevel_destinationOrigin_(
+            self._staging,
+            0,
+            width * 4,
+            width * height * 4,
+            Metal.MTLSizeMake(width, height, 1),
+            self._texture,
+            0,
+            0,
+            Metal.MTLOriginMake(0, 0, 0),
+        )
+        blit.endEncoding()
+        command_buffer.commit()
+        # the staging buffer is rewritten by the next frame
+        command_buffer.waitUntilCompleted()
+
     def send_image(self, image: Image.Image) -> None:
-        if not self._server:
-            return
+        self.send_frame(image)
+
+    def send_frame(self, frame: Union[Image.Image, np.ndarray, torch.Tensor]) -> None:
+        """Queue a PIL image, an RGBA uint8 array or an image tensor for sending.
+
+        Only the latest pending frame is kept; the caller must not modify
+        ``frame`` after handing it over.
+
+        main.py currently passes the pipeline's PIL output; the ndarray and
+        tensor inputs are API only until a pipeline hands over those frames.
+        """
+        self._worker.submit(frame)
+
+    def send_tensor(self, tensor: torch.Tensor) -> None:
+        """Queue an image tensor (CHW/HWC, float [0, 1] or uint8), e.g. still on CUDA.
+
+        Alpha fill and the optional vertical flip run on the tensor's device;
+        only the final RGBA frame is copied to host memory. Not used yet:
+        every pipeline returns PIL images (``output_type="pil"``).
+        """
+        self.send_frame(tensor)
+
+    def _publish(self, frame: Union[Image.Image, np.ndarray, torch.Tensor]) -> None:
         try:
-            if image.mode != "RGBA":
-                image = image.convert("RGBA")
-            width, height = image.size
+            rgb = None
+            if isinstance(frame, torch.Tensor):
+                arr = tensor_to_hwc_uint8(frame, flip_vertical=self._flip_vertical)
+            elif (rgb := rgb_array(frame)) is not None:
+                arr = rgb
+            else:
+                arr = frame_to_rgba(frame)
+            height, width, _ = arr.shape
             self._ensure_texture(width, height)
             if self._texture is None:
                 return
-
-            arr = np.array(image, dtype=np.uint8)
-            if self._flip_vertical:
-                arr = np.flipud(arr).copy()
-            # copy into Metal texture and publish
-            copy_image_to_mtl_texture(arr, self._texture)
+            # write straight into the staging buffer, then blit into the texture
+            if isinstance(arr, torch.Tensor):
+                torch.from_numpy(self._staging_view).copy_(arr)
+                self._staging_opaque = True
+            elif rgb is not None:
+                # RGB: copy only the colour channels, alpha is preset
+                if not self._staging_opaque:
+                    self._staging_view[..., 3] = 255
+                    self._staging_opaque = True
+                self._staging_view[..., :3] = rgb[::-1] if self._flip_vertical else rgb
+            else:
+                if self._flip_vertical:
+                    flip_rows(arr, self._staging_view)
+                else:
+                    np.copyto(self._staging_view, arr)
+                self._staging_opaque = False
+            self._blit_staging(width, height)
             self._server.publish_frame_texture(self._texture)
         except Exception as e:
             logging.error(f"Syphon send failed: {e}")
 
     def close(self) -> None:
+        # returns once the worker thread has exited, so nothing is still
+        # using the native resources released below
+        self._worker.close()
         try:
             if self._server is not None:
                 # syphon-python provides stop() to tear down server
@@ -94,6 +182,9 @@ class SyphonSender:
         finally:
             self._server = None
             self._texture = None
+            self._staging = None
+            self._staging_view = None
+            self._command_queue = None
             self._tex_size = (0, 0)
 
 
@@ -104,5 +195,11 @@ class NullSyphonSender:
     def send_image(self, image: Image.Image) -> None:
         pass
 
+    def send_frame(self, frame) -> None:
+        pass
+
+    def send_tensor(self, tensor: torch.Tensor) -> None:
+        pass
+
     def close(self) -> None:
         pass
@@ -1,7 +1,10 @@
 from importlib import import_module
 from types import ModuleType
+from typing import Optional, Tuple, Union
 from PIL import Image
 import io
+import numpy as np
+import torch
 
 
 def get_pipeline_class(pipeline_name: str) -> ModuleType:
@@ -38,3 +41,59 @@ def pil_to_frame(image: Image.Image) -> bytes:
 
 def is_firefox(user_agent: str) -> bool:
     return "Firefox" in user_agent
+
+
+def frame_to_rgba(frame: Union[Image.Image, np.ndarray]) -> np.ndarray:
+    """Return ``frame`` as a contiguous HxWx4 uint8 RGBA array.
+
+    RGBA uint8 arrays and RGBA PIL images are used without conversion; anything
+    else goes through ``Image.convert("RGBA")``.
+    """
+    if isinstance(frame, np.ndarray):
+        if frame.dtype == np.uint8 and frame.ndim == 3 and frame.shape[-1] == 4:
+            return np.ascontiguousarray(frame)
+        frame = Image.fromarray(frame)
+    if frame.mode != "RGBA":
+        frame = frame.convert("RGBA")
+    return np.asarray(frame)
+
+
+def rgb_array(frame: Union[Image.Image, np.ndarray]) -> Optional[np.ndarray]:
+    """Return ``frame`` as a HxWx3 uint8 array if it is RGB, otherwise None.
+
+    Lets senders copy RGB pixels straight into their own RGBA buffers instead
+    of going through ``Image.convert("RGBA")``.
+    """
+    if isinstance(frame, np.ndarray):
+        if frame.dtype == np.uint8 and frame.ndim == 3 and frame.shape[-1] == 3:
+            return frame
+        return None
+    if frame.mode == "RGB":
+        return np.asarray(frame)
+    return None
+
+
+def tensor_to_hwc_uint8(
+    tensor: torch.Tensor, channels: Tuple[int, ...] = (0, 1, 2), flip_vertical: bool = False
+) -> torch.Tensor:
+    """Convert an image tensor to a HxWx4 uint8 tensor on the same device.
+
+    Accepts CHW/HWC (or a batch of one), float in [0, 1] or uint8. ``channels``
+    selects the source channels written to the first three output channels, the
+    fourth is set to 255. Only reached through the senders' ``send_tensor``,
+    which no pipeline feeds yet.
+    """
+    if tensor.ndim == 4:
+        tensor = tensor[0]
+    if tensor.shape[0] in (3, 4) and tensor.shape[-1] not in (3, 4):
+        tensor = tensor.permute(1, 2, 0)
+    if tensor.dtype != torch.uint8:
+        tensor = (tensor.clamp(0, 1) * 255).round().to(torch.uint8)
+    if flip_vertical:
+        tensor = tensor.flip(0)
+    out = torch.empty(
+        (tensor.shape[0], tensor.shape[1], 4), dtype=torch.uint8, device=tensor.device
+    )
+    out[..., :3] = tensor[..., list(channels)]
+    out[..., 3] = 255
+    return out